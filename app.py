@@ -1,6 +1,8 @@
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
 
 # Title of the app
 st.title("CMS Synthetic vs. LDS Claims Datasets")
@@ -42,57 +44,34 @@ In this post we explore how the two datasets compare on a variety of fundamental
 
 
 ## ---- Load Data ---- ##
+# The data files are cleaned and the summary tables rendered by
+# scripts/build_summaries.py
 @st.cache_data
-def load_data(file):
+def load_data(file, columns=None):
     try:
-        # Load the CSV file into a DataFrame
-        df = pd.read_csv(file)
+        # Load the Parquet file into a DataFrame, reading only the
+        # requested columns off disk
+        df = pd.read_parquet(file, columns=columns)
         return df
     except Exception as e:
-        st.error(f"An error occurred while loading the CSV file: {e}")
+        st.error(f"An error occurred while loading the Parquet file: {e}")
         return pd.DataFrame()
 
 
+# Load a summary table prerendered to HTML
+@st.cache_data
+def load_table(file):
+    try:
+        return Path(file).read_text()
+    except Exception as e:
+        st.error(f"An error occurred while loading the HTML file: {e}")
+        return ""
 
 
-## ---- Claim Type ---- ##
-st.markdown("## Claim Type")
-
-# Load the data
-file = "data/claim_count_by_type.csv"
-df = load_data(file)
-df.columns = df.columns.str.lower()
-
-summary_table = (
-    df.groupby(["data_source", "claim_type"])["claim_count"]
-    .sum()
-    # .groupby(level=0)
-    # .apply(lambda x: (x / x.sum() * 100).round(2))
-    .unstack(fill_value=0)  # Pivot the table, filling missing values with 0
-)
-
-# # Add Total column as the sum of Professional and Institutional
-summary_table["total"] = summary_table.professional+summary_table.institutional
-
-summary_percent = summary_table.div(summary_table["total"], axis=0) * 100
-
-summary_percent = summary_percent.rename(columns={
-    "professional": "Professional",
-    "institutional": "Institutional",
-    "total": "Total"
-})  # Rename the columns
 
-# Replace and rename columns
-summary_percent.index = summary_percent.index.map({
-    "cms_synthetic": "Synthetic",
-    "medicare_lds": "LDS"
-})  # Rename the index values
 
-formatted_table = summary_percent.style.format({
-    "Professional": "{:.2f}%",
-    "Institutional": "{:.2f}%",
-    "Total": "{:.2f}%"
-})
+## ---- Claim Type ---- ##
+st.markdown("## Claim Type")
 
 st.write("""
 Medical claims in health insurance claims data are either one of two types: institutional or professional.  Institutional claims are billed on a UB-04 claim form by facilities (e.g. hospitals) whereas professional claims are billed on a CMS-1500 claim form by physicians (e.g. your primary care doctor) and for medical supplies (e.g. durable medical equipment).  You can find a detailed overview of claim types and forms [here](https://thetuvaproject.com/knowledge/claims-data-fundamentals/intro-to-claims).
@@ -100,7 +79,7 @@ Medical claims in health insurance claims data are either one of two types: inst
 In most claims datasets you'll see professional claims account for ~80% of total medical claim volume and institutional claims making up the remaining share.  The table below shows this is approximately true in the LDS dataset, however, in the synthetic dataset this proportion is flipped.  
 """)
 
-st.table(formatted_table)
+st.markdown(load_table("data/summary_claim_type.html"), unsafe_allow_html=True)
 
 st.write("""
 It can be instructive to look at how these proportions, as well as overall claim volume, change over time.  Generally we expect claim volume to be relatively stable over time.  Dramatic changes or spikes can indicate data quality problems.  The synthetic dataset shows a significant increase in institutional claim volume occurred in Q1 2021.  This is an unusual pattern with no clear explanation.  
@@ -109,41 +88,48 @@ On the other hand, the LDS dataset shows a decrease in claim volume in the first
 """)
 
 # Add a toggle to select the data source
-df["data_source"] = df["data_source"].replace({
-    "cms_synthetic": "Synthetic",
-    "medicare_lds": "LDS"
-})
+df = load_data("data/claim_count_by_type.parquet", columns=["data_source"])
 
 data_source = st.radio(
     "Select Data Source:",
     options=df["data_source"].unique(),
     index=0,
+    key="claim_type_data_source",
 )
 
-# Convert `year_month` to datetime for better visualization
-df["year_month"] = pd.to_datetime(df["year_month"], format="%Y%m")
-
-# Filter data based on the selected data source
-filtered_df = df[df["data_source"] == data_source]
-
-# Plotly Stacked Bar Chart
-fig = px.bar(
-    filtered_df,
-    x="year_month",
-    y="claim_count",
-    color="claim_type",
-    text="claim_count",
-    labels={"year_month": "Year-Month", "claim_count": "Count of Claims", "claim_type": "Claim Type"},
-)
-
-# Customize layout
-fig.update_layout(
-    xaxis=dict(title="Year Month", tickformat="%b %Y"),  # Format x-axis as month-year
-    yaxis=dict(title="Count of Claims"),
-    barmode="stack",  # Ensure stacking of bars
-    legend_title="Claim Type",
-    # title_x=0.5,  # Center the title
-)
+# Build the chart once per data source; reruns reuse the cached figure
+@st.cache_data
+def build_claim_type_fig(data_source):
+    df = load_data("data/claim_count_by_type.parquet")
+
+    # Filter data based on the selected data source
+    filtered_df = df[df["data_source"] == data_source]
+
+    # Plotly Stacked Bar Chart, one trace per claim type
+    fig = go.Figure()
+    for claim_type, group in filtered_df.groupby("claim_type", observed=True):
+        fig.add_trace(go.Bar(
+            x=group["year_month"],
+            y=group["claim_count"],
+            name=claim_type,
+            # Show the count on hover rather than as a text label on every bar
+            hovertemplate="%{x|%b %Y}: %{y:,}<extra>%{fullData.name}</extra>",
+        ))
+
+    # Customize layout
+    fig.update_layout(
+        xaxis=dict(title="Year Month", tickformat="%b %Y"),  # Format x-axis as month-year
+        yaxis=dict(title="Count of Claims"),
+        barmode="stack",  # Ensure stacking of bars
+        legend_title="Claim Type",
+        uirevision="keep",  # Keep zoom and legend state when the data source changes
+        # title_x=0.5,  # Center the title
+    )
+
+    return fig
+
+
+fig = build_claim_type_fig(data_source)
 
 # Display the chart in Streamlit
 st.plotly_chart(fig, use_container_width=True)
@@ -158,49 +144,8 @@ st.write ("""
 Claim type tells us nothing about the type of services being rendered.  To understand this we need to look at service categories.  The Tuva [Service Category Grouper](https://thetuvaproject.com/data-marts/service-categories) assigns every claim line to a 3-tier mutually exclusive and exhaustive hierarchy.  The table below shows how claim volume is distributed at the highest level of the service category grouper.  The distribution of claims in the LDS dataset is approximately what we see with most real claims datasets.  Unfortunately the distribution of claims in the synthetic dataset is nowhere close to this.
 """)
 
-file = "data/claim_count_by_service_category_1.csv"
-df_2 = load_data(file)
-df_2.columns = df_2.columns.str.lower()
-
-# Create the summary table
-summary_table = (
-    df_2.groupby(["data_source", "service_category_1"])["claim_count"]
-    .sum()
-    .unstack(fill_value=0)  # Pivot the table, filling missing values with 0
-)
-
-# Add Total column as the sum of all service categories
-summary_table["total"] = summary_table.sum(axis=1)
-
-# Convert values to percentages
-summary_percent = summary_table.div(summary_table["total"], axis=0) * 100
-
-# Rename columns for better readability
-summary_percent = summary_percent.rename(columns={
-    "inpatient": "Inpatient",
-    "outpatient": "Outpatient",
-    "office-based": "Office-based",
-    "ancillary": "Ancillary",
-    "other": "Other",
-    "total": "Total"
-})
-
-# Replace and rename index for better readability
-summary_percent.index = summary_percent.index.map({
-    "cms_synthetic": "Synthetic",
-    "medicare_lds": "LDS"
-})
-
-# Transpose the table so columns become rows
-pivoted_table = summary_percent.transpose()
-
-# Format the table for display in Streamlit
-formatted_table = pivoted_table.style.format(
-    {col: "{:.2f}%" for col in pivoted_table.columns}
-)
-
 # Display the table in Streamlit
-st.table(formatted_table)
+st.markdown(load_table("data/summary_service_cat.html"), unsafe_allow_html=True)
 
 
 
@@ -216,83 +161,19 @@ We need to group claims into encounters in order to accurately measure the numbe
 The table below shows that dialysis encounters comprise nearly 40% of all encounters in the synthetic dataset, whereas they make up only 1.3% of encounters in LDS.  About the only encounter types that are approximately similar between the two datasets are Outpatient Hospital or Clinic, Emergency Department, and Ambulatory Surgery Center.
 """)
 
-file = "data/encounters.csv"
-df_3 = load_data(file)
-df_3.columns = df_3.columns.str.lower()
-
-# Create the summary table
-summary_table = (
-    df_3.groupby(["data_source", "encounter_group", "encounter_type"])["claim_count"]
-    .sum()
-    .reset_index()  # Ensure all groupers are explicit columns
-)
-
-# Pivot the table to create columns for data sources (Synthetic and LDS)
-pivoted_table = summary_table.pivot_table(
-    index=["encounter_group", "encounter_type"],
-    columns="data_source",
-    values="claim_count",
-    fill_value=0
-).reset_index()
-
-# Rename columns for clarity
-pivoted_table.columns.name = None
-pivoted_table = pivoted_table.rename(columns={
-    "cms_synthetic": "Synthetic",
-    "medicare_lds": "LDS",
-    "encounter_group": "Encounter Group",
-    "encounter_type": "Encounter Type"
-})
-
-# Calculate percentages for Synthetic and LDS
-synthetic_total = pivoted_table["Synthetic"].sum()
-lds_total = pivoted_table["LDS"].sum()
-
-pivoted_table["Synthetic"] = (pivoted_table["Synthetic"] / synthetic_total * 100)
-pivoted_table["LDS"] = (pivoted_table["LDS"] / lds_total * 100)
-
-# Add a total row at the bottom using pd.concat
-total_row = pd.DataFrame({
-    "Encounter Group": ["Total"],
-    "Encounter Type": [""],
-    "Synthetic": [pivoted_table["Synthetic"].sum()],
-    "LDS": [pivoted_table["LDS"].sum()]
-})
-
-pivoted_table = pd.concat([pivoted_table, total_row], ignore_index=True)
-
-# Format the table for display in Streamlit with percentages for Synthetic and LDS
-formatted_table = pivoted_table.style.format(
-    {
-        "Synthetic": "{:.2f}%",
-        "LDS": "{:.2f}%"
-    }
-)
+# Display the table in Streamlit with percentages for Synthetic and LDS
+st.markdown(load_table("data/summary_encounters.html"), unsafe_allow_html=True)
 
-# Display the table in Streamlit
-st.table(formatted_table)
 
 
-
-file = "data/encounters.csv"
-df_3 = load_data(file)
-df_3.columns = df_3.columns.str.lower()
-
-# Create the summary table
-summary_table = (
-    df_3.groupby(["data_source", "encounter_group", "encounter_type", "year_month"])["claim_count"]
-    .sum()
-    .reset_index()  # Ensure all groupers are explicit columns
-)
-
-# Ensure the 'year_month' column is in the correct datetime format
-summary_table["year_month"] = pd.to_datetime(summary_table["year_month"], format="%Y%m")
+summary_table = load_data("data/summary_encounters_ts.parquet", columns=["data_source", "encounter_type"])
 
 # Add toggles for the data source and encounter type
 data_source = st.radio(
     "Select Data Source:",
     options=summary_table["data_source"].unique(),
     index=0,
+    key="encounters_data_source",
 )
 
 encounter_type = st.selectbox(
@@ -301,92 +182,45 @@ encounter_type = st.selectbox(
     index=0,
 )
 
-# Filter data based on user selection
-filtered_df = summary_table[
-    (summary_table["data_source"] == data_source) &
-    (summary_table["encounter_type"] == encounter_type)
-]
-
-# Plot the time series chart
-fig = px.bar(
-    filtered_df,
-    x="year_month",
-    y="claim_count",
-    color="encounter_group",
-    text="claim_count",
-    labels={
-        "year_month": "Year-Month",
-        "claim_count": "Count of Claims",
-        "encounter_group": "Encounter Group",
-    },
-    title=f"Time Series for {encounter_type} ({data_source})",
-)
-
-# Customize chart layout
-fig.update_layout(
-    xaxis=dict(title="Year-Month", tickformat="%b %Y"),
-    yaxis=dict(title="Count of Claims"),
-    barmode="stack",
-    legend_title="Encounter Group",
-)
+# Build the chart once per selection; reruns reuse the cached figure
+@st.cache_data
+def build_encounters_fig(data_source, encounter_type):
+    summary_table = load_data("data/summary_encounters_ts.parquet")
+
+    # Filter data based on user selection
+    filtered_df = summary_table[
+        (summary_table["data_source"] == data_source) &
+        (summary_table["encounter_type"] == encounter_type)
+    ]
+
+    # Plot the time series chart, one trace per encounter group
+    fig = go.Figure()
+    for encounter_group, group in filtered_df.groupby("encounter_group", observed=True):
+        fig.add_trace(go.Bar(
+            x=group["year_month"],
+            y=group["claim_count"],
+            name=encounter_group,
+            hovertemplate="%{x|%b %Y}: %{y:,}<extra>%{fullData.name}</extra>",
+        ))
+
+    # Customize chart layout
+    fig.update_layout(
+        title=f"Time Series for {encounter_type} ({data_source})",
+        xaxis=dict(title="Year-Month", tickformat="%b %Y"),
+        yaxis=dict(title="Count of Claims"),
+        barmode="stack",
+        legend_title="Encounter Group",
+        uirevision="keep",
+    )
+
+    return fig
+
+
+fig = build_encounters_fig(data_source, encounter_type)
 
 # Display the chart in Streamlit
 st.plotly_chart(fig, use_container_width=True)
 
-# Pivot the table to create columns for data sources (Synthetic and LDS)
-pivoted_table = summary_table.pivot_table(
-    index=["encounter_group", "encounter_type"],
-    columns="data_source",
-    values="claim_count",
-    fill_value=0
-).reset_index()
-
-# Rename columns for clarity
-pivoted_table.columns.name = None
-pivoted_table = pivoted_table.rename(columns={
-    "cms_synthetic": "Synthetic",
-    "medicare_lds": "LDS",
-    "encounter_group": "Encounter Group",
-    "encounter_type": "Encounter Type"
-})
-
-# Calculate percentages for Synthetic and LDS
-synthetic_total = pivoted_table["Synthetic"].sum()
-lds_total = pivoted_table["LDS"].sum()
-
-pivoted_table["Synthetic"] = (pivoted_table["Synthetic"] / synthetic_total * 100)
-pivoted_table["LDS"] = (pivoted_table["LDS"] / lds_total * 100)
-
-# Add a total row at the bottom using pd.concat
-total_row = pd.DataFrame({
-    "Encounter Group": ["Total"],
-    "Encounter Type": [""],
-    "Synthetic": [pivoted_table["Synthetic"].sum()],
-    "LDS": [pivoted_table["LDS"].sum()]
-})
-
-pivoted_table = pd.concat([pivoted_table, total_row], ignore_index=True)
-
-# Format the table for display in Streamlit with percentages for Synthetic and LDS
-formatted_table = pivoted_table.style.format(
-    {
-        "Synthetic": "{:.2f}%%",
-        "LDS": "{:.2f}%%"
-    }
-)
-
-# Display the table in Streamlit
-st.table(formatted_table)
-
-
-
-
-
-
-
-
-
-
 
 
 
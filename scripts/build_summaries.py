@@ -0,0 +1,206 @@
+"""Build the data files the app reads.
+
+Cleans the CSV exports in data/ (produced by the queries in sql/), saves
+them as Parquet, and renders the summary tables shown in the app to HTML,
+so none of the aggregation or formatting runs at request time. The
+aggregation runs in Polars; frames are only converted to pandas when
+they are written out. Re-run this script after refreshing the CSVs:
+
+    pip install -r scripts/requirements.txt
+    python scripts/build_summaries.py
+"""
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+# Display labels for the data sources, in the order the app shows them
+DATA_SOURCES = {
+    "cms_synthetic": "Synthetic",
+    "medicare_lds": "LDS"
+}
+
+# Low-cardinality grouping keys, stored as categoricals in the Parquet files
+CATEGORY_COLUMNS = ("claim_type", "encounter_group", "encounter_type", "service_category_1")
+
+
+def load_data(file):
+    df = pl.read_csv(file)
+    df = df.rename(str.lower)
+
+    return df.with_columns(
+        # Relabel the data sources once here instead of in every table
+        pl.col("data_source").replace_strict(
+            DATA_SOURCES, return_dtype=pl.Enum(list(DATA_SOURCES.values()))
+        ),
+        # Parse the YYYYMM months into datetimes for better visualization
+        pl.col("year_month").cast(pl.String).str.strptime(pl.Datetime("ms"), "%Y%m"),
+        # Keep Int64 through the aggregations; Polars sums stay in the input
+        # dtype and would silently wrap past the Int32 limit
+        pl.col("claim_count").cast(pl.Int64),
+    )
+
+
+def to_pandas(df, downcast=False):
+    df = df.to_pandas()
+    if downcast:
+        # Per-row counts fit comfortably in int32; aggregated sums stay int64
+        df["claim_count"] = df["claim_count"].astype("int32")
+    if "data_source" in df:
+        df["data_source"] = df["data_source"].cat.as_unordered()
+    for col in CATEGORY_COLUMNS:
+        if col in df:
+            df[col] = df[col].astype("category")
+    return df
+
+
+## ---- Claim Type ---- ##
+def build_claim_type_summary(df):
+    summary_table = (
+        df.group_by("data_source", "claim_type")
+        .agg(pl.col("claim_count").sum())
+        .pivot(on="claim_type", index="data_source", values="claim_count")
+        .fill_null(0)  # Fill missing claim types with 0
+        .sort("data_source")
+    )
+    claim_types = sorted(summary_table.columns[1:])
+
+    # Convert values to percentages of the Professional + Institutional total,
+    # plus a Total column, which is 100% by construction
+    row_totals = pl.sum_horizontal(claim_types)
+    summary_percent = summary_table.select(
+        "data_source",
+        *[pl.col(c) / row_totals * 100 for c in claim_types],
+        total=pl.lit(100.0),
+    )
+
+    summary_percent = summary_percent.rename({
+        "professional": "Professional",
+        "institutional": "Institutional",
+        "total": "Total"
+    })  # Rename the columns
+
+    return to_pandas(summary_percent).set_index("data_source").rename_axis(columns="claim_type")
+
+
+## ---- Service Category ---- ##
+def build_service_cat_summary(df_2):
+    # Create the summary table
+    summary_table = (
+        df_2.group_by("data_source", "service_category_1")
+        .agg(pl.col("claim_count").sum())
+        .pivot(on="service_category_1", index="data_source", values="claim_count")
+        .fill_null(0)  # Fill missing service categories with 0
+        .sort("data_source")
+    )
+    service_categories = sorted(summary_table.columns[1:])
+
+    # Convert values to percentages of the total across all service categories,
+    # plus a Total column, which is 100% by construction
+    row_totals = pl.sum_horizontal(service_categories)
+    summary_percent = summary_table.select(
+        "data_source",
+        *[pl.col(c) / row_totals * 100 for c in service_categories],
+        total=pl.lit(100.0),
+    )
+
+    # Rename columns for better readability
+    summary_percent = summary_percent.rename({
+        "inpatient": "Inpatient",
+        "outpatient": "Outpatient",
+        "office-based": "Office-based",
+        "ancillary": "Ancillary",
+        "other": "Other",
+        "total": "Total"
+    })
+
+    # Transpose the table so columns become rows
+    return (
+        to_pandas(summary_percent)
+        .set_index("data_source")
+        .transpose()
+        .rename_axis("service_category_1")
+    )
+
+
+## ---- Encounters ---- ##
+def build_encounters_timeseries(df_3):
+    # Create the summary table
+    return (
+        df_3.group_by("data_source", "encounter_group", "encounter_type", "year_month")
+        .agg(pl.col("claim_count").sum())
+        .sort("data_source", "encounter_group", "encounter_type", "year_month")
+    )
+
+
+def build_encounters_pivot(summary_table):
+    # Roll the monthly counts up into a column for each data source (Synthetic and LDS)
+    pivoted_table = (
+        summary_table.group_by("encounter_group", "encounter_type", "data_source")
+        .agg(pl.col("claim_count").sum())
+        .pivot(on="data_source", index=["encounter_group", "encounter_type"], values="claim_count")
+        .fill_null(0)  # Fill missing encounter types with 0
+        .sort("encounter_group", "encounter_type")
+    )
+
+    # Calculate percentages for Synthetic and LDS
+    pivoted_table = pivoted_table.select(
+        pl.col("encounter_group").alias("Encounter Group"),
+        pl.col("encounter_type").alias("Encounter Type"),
+        *[pl.col(c) / pl.col(c).sum() * 100 for c in DATA_SOURCES.values()],
+    )
+    pivoted_table = pivoted_table.to_pandas()
+
+    # Add a total row at the bottom; each column was just normalized to 100%
+    pivoted_table.loc[len(pivoted_table)] = {
+        "Encounter Group": "Total",
+        "Encounter Type": "",
+        "Synthetic": 100.0,
+        "LDS": 100.0
+    }
+
+    return pivoted_table
+
+
+def build_all_summaries():
+    # Read each export once and build every file the app reads from it
+    df = load_data(DATA_DIR / "claim_count_by_type.csv")
+    df_2 = load_data(DATA_DIR / "claim_count_by_service_category_1.csv")
+    df_3 = load_data(DATA_DIR / "encounters.csv")
+    summary_table = build_encounters_timeseries(df_3)
+
+    return {
+        "claim_count_by_type.parquet": to_pandas(df, downcast=True),
+        "summary_claim_type.html": build_claim_type_summary(df),
+        "summary_service_cat.html": build_service_cat_summary(df_2),
+        "summary_encounters.html": build_encounters_pivot(summary_table),
+        "summary_encounters_ts.parquet": to_pandas(summary_table),
+    }
+
+
+def write_output(df, name):
+    output_file = DATA_DIR / name
+    if output_file.suffix == ".html":
+        # The summary tables never change at runtime, so format the
+        # percentages and render the HTML once here
+        for col in df.select_dtypes("number").columns:
+            df[col] = np.char.mod("%.2f%%", df[col].to_numpy())
+        # Only the labelled indexes (data sources, service categories) are
+        # shown; the axis names themselves are internal column names
+        show_index = df.index.name is not None
+        df = df.rename_axis(index=None, columns=None)
+        output_file.write_text(df.to_html(index=show_index))
+    else:
+        df.to_parquet(output_file, compression="zstd")
+    print(f"Wrote {output_file.relative_to(DATA_DIR.parent)}")
+
+
+def main():
+    for name, df in build_all_summaries().items():
+        write_output(df, name)
+
+
+if __name__ == "__main__":
+    main()